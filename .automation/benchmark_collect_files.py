@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Benchmark MegaLinter files collection on a generated git repository
+
+Usage: python .automation/benchmark_collect_files.py [--files 50000] [--runs 5]
+Run it with PYTHONPATH set to another MegaLinter checkout to compare versions
+"""
+import argparse
+import logging
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+# Patterns of the generated .gitignore file
+GITIGNORE_PATTERNS = [
+    "build/",
+    "dist/",
+    ".venv/",
+    "coverage/",
+    "*.log",
+    "!important.log",
+    "*.tmp",
+    "*.pyc",
+    "__pycache__/",
+    ".cache/",
+    "*.egg-info/",
+    ".tox/",
+    "*.swp",
+    ".DS_Store",
+    "/tmp/",
+    "*.bak",
+    ".idea/",
+    ".vscode/",
+    "docs/_build/",
+    "src/**/generated/",
+]
+
+# Extensions of generated source files
+SOURCE_EXTENSIONS = [".py", ".js", ".ts", ".md", ".json", ".yml", ".sh", ".txt"]
+
+
+# Create a git repository with files_number files, a quarter of them being ignored
+def create_repository(root, files_number):
+    ignored_directories = ["build", "dist", ".venv/lib", "coverage"]
+    ignored_files_number = files_number // 4
+    for i in range(0, ignored_files_number):
+        directory = os.path.join(
+            root, ignored_directories[i % len(ignored_directories)], f"d{i % 50}"
+        )
+        create_file(directory, f"f{i}.js")
+    for i in range(0, files_number - ignored_files_number):
+        directory = os.path.join(root, "src", f"pkg{i % 40}", f"mod{i % 25}")
+        if i % 20 == 0:
+            file_name = f"f{i}.log"
+        elif i % 33 == 0:
+            directory = os.path.join(directory, "generated")
+            file_name = f"f{i}.py"
+        else:
+            file_name = f"f{i}{SOURCE_EXTENSIONS[i % len(SOURCE_EXTENSIONS)]}"
+        create_file(directory, file_name)
+    with open(os.path.join(root, ".gitignore"), "w", encoding="utf-8") as f:
+        f.write("\n".join(GITIGNORE_PATTERNS) + "\n")
+    subprocess.run(["git", "init", "-q", root], check=True)
+
+
+def create_file(directory, file_name):
+    os.makedirs(directory, exist_ok=True)
+    with open(os.path.join(directory, file_name), "w", encoding="utf-8") as f:
+        f.write("x\n")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--files", type=int, default=50000)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as root:
+        create_repository(root, args.files)
+        os.environ.update(
+            {
+                "DEFAULT_WORKSPACE": root,
+                "LOG_FILE": "none",
+                "LOG_LEVEL": "WARNING",
+                "REPORT_OUTPUT_FOLDER": os.path.join(root, "tmp", "reports"),
+            }
+        )
+        from megalinter import Megalinter, config
+
+        megalinter = Megalinter({"cli": False})
+        logging.getLogger().setLevel(logging.WARNING)
+        durations = []
+        for _ in range(0, args.runs):
+            # Linters keep files of the previous collection
+            for linter in megalinter.linters:
+                linter.files = []
+                linter.is_active = True
+            start = time.perf_counter()
+            megalinter.collect_files()
+            durations.append(time.perf_counter() - start)
+        config.delete()
+        print(
+            f"collect_files on {args.files} files: "
+            f"best {min(durations):.3f}s, "
+            f"median {sorted(durations)[len(durations) // 2]:.3f}s "
+            f"({args.runs} runs, {sum(len(linter.files) for linter in megalinter.linters)}"
+            " files collected by linters)"
+        )
+
+
+if __name__ == "__main__":
+    sys.exit(main())
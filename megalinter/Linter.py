@@ -335,6 +335,7 @@ class Linter:
 
             # Runtime items
             self.files = []
+            self.files_cached = []
             self.try_fix = False
             self.status = "success"
             self.stdout = None
@@ -660,6 +661,9 @@ class Linter:
                 self.update_files_lint_results(
                     [file], return_code, file_status, stdout, file_errors_number
                 )
+            # Report files skipped because of their cached success result
+            if len(self.files_cached) > 0:
+                self.update_files_lint_results(self.files_cached, 0, "success", "", 0)
         else:
             # Lint all workspace in one command
             return_code, stdout = self.process_linter()
@@ -6,13 +6,20 @@ Main MegaLinter class, encapsulating all linters process and reporting
 
 import argparse
 import logging
+import math
 import multiprocessing as mp
 import os
+import re
 import shutil
+import subprocess
 import sys
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass, fields
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
 
 import chalk as c
-import git
 from megalinter import (
     Linter,
     config,
@@ -20,6 +27,7 @@ from megalinter import (
     linter_factory,
     plugin_factory,
     pre_post_factory,
+    results_cache,
     utils,
 )
 from megalinter.constants import (
@@ -28,7 +36,114 @@ from megalinter.constants import (
     ML_DOC_URL,
 )
 from megalinter.utils_reporter import log_section_end, log_section_start
-from multiprocessing_logging import install_mp_handler
+
+# Start pool workers from a server process with preloaded modules:
+# faster than spawn, and safer than forking a process that may run threads
+if "forkserver" in mp.get_all_start_methods():
+    MP_CONTEXT = mp.get_context("forkserver")
+    MP_CONTEXT.set_forkserver_preload(
+        ["megalinter", "megalinter.Linter", "git", "chalk"]
+    )
+else:
+    MP_CONTEXT = mp.get_context()
+
+# Linters known by a pool worker, by name, so tasks only send linter names
+WORKER_LINTERS = {}
+
+# Logging levels by LOG_LEVEL value
+LOGGING_LEVELS = {
+    "INFO": logging.INFO,
+    "DEBUG": logging.DEBUG,
+    "WARNING": logging.WARNING,
+    "ERROR": logging.ERROR,
+    # Previous values for v3 ascending compatibility
+    "TRACE": logging.WARNING,
+    "VERBOSE": logging.INFO,
+}
+
+# Header lines, built once
+HEADER_HYPHENS = utils.format_hyphens("")
+HEADER_TITLE = utils.format_hyphens("MegaLinter, by OX Security")
+
+# Linter groups with an estimated cost up to this value are light enough to be run by
+# the main process, as sending them to a worker would cost more than running them
+LIGHT_LINTER_GROUP_MAX_COST = 3
+
+# Final status messages
+RESULT_SUCCESS_MESSAGE = c.green("✅ Successfully linted all files without errors")
+RESULT_WARNING_MESSAGE = c.yellow(
+    "◬ Successfully linted all files, but with ignored errors"
+)
+RESULT_ERROR_MESSAGE = c.red("❌ Error(s) have been found during linting")
+UPDATED_SOURCES_ERROR_MESSAGE = c.red(
+    "❌ Sources has been updated by linter auto-fixes, and FAIL_IF_UPDATED_SOURCES has been set to true"
+)
+
+# Upgrade message displayed to users of legacy versions
+LEGACY_VERSION_REGEX = re.compile(r"insiders|v[45]")
+UPGRADE_MESSAGE_SEPARATOR = c.yellow(
+    "#######################################################################"
+)
+UPGRADE_MESSAGE = "\n".join(
+    [
+        UPGRADE_MESSAGE_SEPARATOR,
+        c.yellow(
+            "MEGA-LINTER HAS A NEW V6 VERSION at https://github.com/oxsecurity/megalinter .\n"
+            + "Please upgrade your configuration by running the following command at the "
+            + "root of your repository (requires node.js): \n"
+            + c.green("npx mega-linter-runner --upgrade")
+        ),
+        UPGRADE_MESSAGE_SEPARATOR,
+    ]
+)
+
+
+# Log file handler writing records by blocks instead of flushing each of them: the
+# buffer is written when the handler is explicitly flushed, before reporters read the
+# log file, or when it is closed, at the latest by logging.shutdown at exit
+class BufferedFileHandler(logging.FileHandler):
+    def __init__(self, filename, buffer_size=64 * 1024):
+        self.buffer_size = buffer_size
+        super().__init__(filename, "w", "utf-8")
+
+    def _open(self):
+        return open(
+            self.baseFilename,
+            self.mode,
+            buffering=self.buffer_size,
+            encoding=self.encoding,
+            errors=self.errors,
+        )
+
+    # Same as StreamHandler.emit, without flushing the stream after each record
+    def emit(self, record):
+        if self.stream is None:
+            return
+        try:
+            self.stream.write(self.format(record) + self.terminator)
+        except RecursionError:
+            raise
+        except Exception:
+            self.handleError(record)
+
+
+# Initialize a pool worker with the context of the main process, as it is not forked from it
+def init_linters_worker(
+    runtime_config, environment, cwd, log_queue, logging_level, linters
+):
+    global WORKER_LINTERS
+    WORKER_LINTERS = linters
+    config.set_config(runtime_config)
+    os.environ.clear()
+    os.environ.update(environment)
+    os.chdir(cwd)
+    # Send log records to the main process, that writes them with its own handlers
+    logging.basicConfig(
+        force=True,
+        level=logging_level,
+        format="%(message)s",
+        handlers=[QueueHandler(log_queue)],
+    )
 
 
 # Function to run linters using multiprocessing pool
@@ -38,6 +153,80 @@ def run_linters(linters):
     return linters
 
 
+# Function run by pool workers: only send back what linters runs updated
+def run_linters_in_worker(linter_names):
+    linters = [WORKER_LINTERS[linter_name] for linter_name in linter_names]
+    return [LinterResult.from_linter(linter) for linter in run_linters(linters)]
+
+
+# Linter attributes updated by a linter run, sent back by pool workers instead of
+# pickling the whole linter object
+@dataclass
+class LinterResult:
+    name: str
+    status: str
+    return_code: int
+    number_errors: int
+    total_number_errors: int
+    number_fixed: int
+    files_lint_results: list
+    stdout: Optional[str]
+    elapsed_time_s: float
+    start_perf: float
+    log_lines_pre: list
+    log_lines_post: list
+    linter_version_cache: Optional[str]
+    try_fix: bool
+    disable_errors: bool
+    pre_commands: Optional[list]
+    final_config_file: Optional[str]
+    final_ignore_file: Optional[str]
+    sarif_output_file: Optional[str]
+    remote_config_file_to_delete: Optional[str]
+    remote_ignore_file_to_delete: Optional[str]
+
+    @classmethod
+    def from_linter(cls, linter):
+        return cls(
+            **{field.name: getattr(linter, field.name, None) for field in fields(cls)}
+        )
+
+    def apply_to(self, linter):
+        for field in fields(self):
+            setattr(linter, field.name, getattr(self, field.name))
+
+
+# Create the pool used to run linters in parallel, and terminate its workers once the
+# run is over. Linters are sent once to each worker when it starts, so a pool can not
+# be reused by a run with other linters
+@contextmanager
+def linters_pool(processes, linters):
+    # Managed queue: a record is queued when the worker logging call returns
+    with MP_CONTEXT.Manager() as manager:
+        log_queue = manager.Queue()
+        log_listener = QueueListener(log_queue, *logging.getLogger().handlers)
+        pool = MP_CONTEXT.Pool(
+            processes,
+            initializer=init_linters_worker,
+            initargs=(
+                config.get_config(),
+                dict(os.environ),
+                os.getcwd(),
+                log_queue,
+                logging.getLogger().level,
+                {linter.name: linter for linter in linters},
+            ),
+        )
+        log_listener.start()
+        try:
+            yield pool
+        finally:
+            pool.close()
+            pool.join()
+            # Write all remaining log records of workers before going further
+            log_listener.stop()
+
+
 # Main MegaLinter class, orchestrating files collection, linter processes and reporters
 class Megalinter:
 
@@ -102,6 +291,9 @@ class Megalinter:
         self.linters: list[Linter] = []
         self.file_extensions = []
         self.file_names_regex = []
+        self.filter_regex_include_object = None
+        self.filter_regex_exclude_object = None
+        self.file_names_regex_object = None
         self.status = "success"
         self.return_code = 0
         self.has_git_extraheader = False
@@ -110,6 +302,7 @@ class Megalinter:
             config.get("FAIL_IF_UPDATED_SOURCES", "false") == "true"
         )
         self.flavor_suggestions = None
+        self.results_cache = None
         # Initialize plugins
         plugin_factory.initialize_plugins()
         # Run user-defined commands
@@ -146,7 +339,7 @@ class Megalinter:
         linters_do_fixes = False
         for linter in self.linters:
             if linter.is_active is True:
-                active_linters += [linter]
+                active_linters.append(linter)
                 if linter.apply_fixes is True:
                     linters_do_fixes = True
 
@@ -165,6 +358,10 @@ class Megalinter:
         else:
             self.process_linters_serial(active_linters, linters_do_fixes)
 
+        # Remember files linted with success for next runs
+        if self.results_cache is not None:
+            self.results_cache.store_results(active_linters)
+
         # Update main MegaLinter status according to results of linters run
         for linter in self.linters:
             if linter.status != "success":
@@ -199,7 +396,9 @@ class Megalinter:
         # Run user-defined commands
         self.post_commands_results = pre_post_factory.run_post_commands(self)
 
-        # Generate reports
+        # Generate reports, once buffered logs are written as reporters can send log file
+        for handler in logging.getLogger().handlers:
+            handler.flush()
         for reporter in self.reporters:
             reporter.produce_report()
         # Process commmands before closing MegaLinter
@@ -218,40 +417,123 @@ class Megalinter:
             # Group linters by descriptor, to avoid different linters to update files at the same time
             linters_by_descriptor = {}
             for linter in active_linters:
-                descriptor_active_linters = linters_by_descriptor.get(
-                    linter.descriptor_id, []
+                linters_by_descriptor.setdefault(linter.descriptor_id, []).append(
+                    linter
                 )
-                descriptor_active_linters += [linter]
-                linters_by_descriptor[linter.descriptor_id] = descriptor_active_linters
-            for _descriptor_id, linters in linters_by_descriptor.items():
-                linter_groups += [linters]
+            linter_groups.extend(linters_by_descriptor.values())
         else:
             # If no fixes are applied, we don't care to run same languages linters at the same time
             for linter in active_linters:
-                linter_groups += [[linter]]
-        # Execute linters in asynchronous pool to improve overall performances
-        install_mp_handler()
-        pool = mp.Pool(mp.cpu_count())
-        pool_results = []
-        # Add linter groups to pool
+                linter_groups.append([linter])
+        # Start the most expensive linter groups first, so the run does not end with
+        # workers waiting for a long group started last
+        linter_groups.sort(key=self.estimate_linter_group_cost, reverse=True)
         for linter_group in linter_groups:
             logging.debug(
                 linter_group[0].descriptor_id
                 + ": "
                 + str([o.linter_name for o in linter_group])
             )
-            result = pool.apply_async(run_linters, args=[linter_group])
-            pool_results += [result]
-        pool.close()
-        pool.join()
-        # Update self.linters objects with results from async processing
-        for pool_result in pool_results:
-            updated_linters = pool_result.get()
-            for updated_linter in updated_linters:
-                for i in range(0, len(self.linters)):
-                    if self.linters[i].name == updated_linter.name:
-                        self.linters[i] = updated_linter
-                        break
+        pool_size = self.get_linters_pool_size(linter_groups)
+        if config.get("PARALLEL_BACKEND", "thread") == "process":
+            self.process_linter_groups_in_processes(linter_groups, pool_size)
+        else:
+            self.process_linter_groups_in_threads(linter_groups, pool_size)
+
+    # Linters mostly wait for their external commands: threads are enough to run them
+    # at the same time, and they update self.linters objects directly
+    # noinspection PyMethodMayBeStatic
+    def process_linter_groups_in_threads(self, linter_groups, pool_size):
+        with ThreadPoolExecutor(max_workers=pool_size) as executor:
+            for _linters in executor.map(run_linters, linter_groups):
+                pass
+
+    # Linters are sent to worker processes, then their updated version is sent back
+    def process_linter_groups_in_processes(self, linter_groups, pool_size):
+        main_process_groups, pool_groups = self.split_linter_groups(
+            linter_groups, pool_size
+        )
+        if len(pool_groups) == 0:
+            for linter_group in main_process_groups:
+                run_linters(linter_group)
+            return
+        # Update self.linters objects with results as soon as a linter group is processed
+        linters_by_name = {linter.name: linter for linter in self.linters}
+        # Execute linters in asynchronous pool to improve overall performances
+        with linters_pool(
+            min(pool_size, len(pool_groups)),
+            [linter for linter_group in pool_groups for linter in linter_group],
+        ) as pool:
+            pool_results = pool.imap_unordered(
+                run_linters_in_worker,
+                [
+                    [linter.name for linter in linter_group]
+                    for linter_group in pool_groups
+                ],
+            )
+            # Light linter groups are run by the main process while workers are busy
+            for linter_group in main_process_groups:
+                run_linters(linter_group)
+            for linter_results in pool_results:
+                self.merge_linter_results(linter_results, linters_by_name)
+
+    # Keep the lightest linter groups for the main process, that takes its share of
+    # groups like one more worker, and send the other ones to the pool
+    def split_linter_groups(self, linter_groups, pool_size):
+        light_groups = sorted(
+            (
+                linter_group
+                for linter_group in linter_groups
+                if self.estimate_linter_group_cost(linter_group)
+                <= LIGHT_LINTER_GROUP_MAX_COST
+            ),
+            key=self.estimate_linter_group_cost,
+        )
+        main_process_groups_number = math.ceil(len(linter_groups) / (pool_size + 1))
+        main_process_groups = light_groups[:main_process_groups_number]
+        for linter_group in main_process_groups:
+            logging.debug(
+                "Run by main process: "
+                + str([linter.linter_name for linter in linter_group])
+            )
+        pool_groups = [
+            linter_group
+            for linter_group in linter_groups
+            if not any(linter_group is group for group in main_process_groups)
+        ]
+        return main_process_groups, pool_groups
+
+    # Estimate the work of a linter group with the number of files it lints.
+    # Project linters browse the whole workspace, so they are never light
+    # noinspection PyMethodMayBeStatic
+    def estimate_linter_group_cost(self, linter_group):
+        cost = 0
+        for linter in linter_group:
+            if linter.cli_lint_mode == "project":
+                return math.inf
+            cost += len(linter.files)
+        return cost
+
+    # Update linters with the results returned by the pool
+    # noinspection PyMethodMayBeStatic
+    def merge_linter_results(self, linter_results, linters_by_name):
+        for linter_result in linter_results:
+            linter_result.apply_to(linters_by_name[linter_result.name])
+
+    # Do not start more workers than linter groups, nor than MEGALINTER_POOL_SIZE
+    # noinspection PyMethodMayBeStatic
+    def get_linters_pool_size(self, linter_groups):
+        pool_size = min(mp.cpu_count(), len(linter_groups))
+        max_pool_size = str(config.get("MEGALINTER_POOL_SIZE", ""))
+        if max_pool_size != "":
+            try:
+                pool_size = min(pool_size, int(max_pool_size))
+            except ValueError:
+                logging.warning(
+                    f"MEGALINTER_POOL_SIZE must be an integer (found {max_pool_size}):"
+                    " using the number of available CPUs, up to the number of linter groups"
+                )
+        return max(1, pool_size)
 
     # noinspection PyMethodMayBeStatic
     def get_workspace(self):
@@ -274,75 +556,83 @@ class Megalinter:
                     + self.arg_input
                 )
                 return DEFAULT_DOCKER_WORKSPACE_DIR + "/" + self.arg_input
+        # Candidate workspaces by priority, as (context, directory to check, workspace):
+        # the first one with an existing directory is used
+        candidates = []
         # Github action run without override of DEFAULT_WORKSPACE and using DEFAULT_DOCKER_WORKSPACE_DIR
-        elif (
-            default_workspace == ""
-            and github_workspace != ""
-            and os.path.isdir(github_workspace + DEFAULT_DOCKER_WORKSPACE_DIR)
-        ):
-            logging.debug(
-                "[Context] Github action run without override of DEFAULT_WORKSPACE - "
-                + DEFAULT_DOCKER_WORKSPACE_DIR
-            )
-            return github_workspace + DEFAULT_DOCKER_WORKSPACE_DIR
-        # Docker run without override of DEFAULT_WORKSPACE
-        elif default_workspace != "" and os.path.isdir(
-            DEFAULT_DOCKER_WORKSPACE_DIR + os.path.sep + default_workspace
-        ):
-            logging.debug(
-                "[Context] Docker run without override of DEFAULT_WORKSPACE"
-                f" - {default_workspace}{DEFAULT_DOCKER_WORKSPACE_DIR}{os.path.sep + default_workspace}"
-            )
-            return (
-                default_workspace
-                + DEFAULT_DOCKER_WORKSPACE_DIR
-                + os.path.sep
-                + default_workspace
-            )
-        # Docker run with override of DEFAULT_WORKSPACE for test cases
-        elif default_workspace != "" and os.path.isdir(default_workspace):
-            logging.debug(
-                f"[Context] Docker run test classes with override of DEFAULT_WORKSPACE - {default_workspace}"
-            )
-            return default_workspace
+        if default_workspace == "" and github_workspace != "":
+            candidates += [
+                (
+                    "Github action run without override of DEFAULT_WORKSPACE - "
+                    + DEFAULT_DOCKER_WORKSPACE_DIR,
+                    github_workspace + DEFAULT_DOCKER_WORKSPACE_DIR,
+                    github_workspace + DEFAULT_DOCKER_WORKSPACE_DIR,
+                )
+            ]
+        if default_workspace != "":
+            candidates += [
+                # Docker run without override of DEFAULT_WORKSPACE
+                (
+                    "Docker run without override of DEFAULT_WORKSPACE"
+                    f" - {default_workspace}{DEFAULT_DOCKER_WORKSPACE_DIR}{os.path.sep + default_workspace}",
+                    DEFAULT_DOCKER_WORKSPACE_DIR + os.path.sep + default_workspace,
+                    default_workspace
+                    + DEFAULT_DOCKER_WORKSPACE_DIR
+                    + os.path.sep
+                    + default_workspace,
+                ),
+                # Docker run with override of DEFAULT_WORKSPACE for test cases
+                (
+                    "Docker run test classes with override of DEFAULT_WORKSPACE"
+                    f" - {default_workspace}",
+                    default_workspace,
+                    default_workspace,
+                ),
+            ]
         # Docker run test classes without override of DEFAULT_WORKSPACE
-        elif os.path.isdir(DEFAULT_DOCKER_WORKSPACE_DIR):
-            logging.debug(
-                "[Context] Docker run test classes without override of DEFAULT_WORKSPACE - "
-                + DEFAULT_DOCKER_WORKSPACE_DIR
+        candidates += [
+            (
+                "Docker run test classes without override of DEFAULT_WORKSPACE - "
+                + DEFAULT_DOCKER_WORKSPACE_DIR,
+                DEFAULT_DOCKER_WORKSPACE_DIR,
+                DEFAULT_DOCKER_WORKSPACE_DIR,
             )
-            return DEFAULT_DOCKER_WORKSPACE_DIR
+        ]
         # Github action with override of DEFAULT_WORKSPACE
-        elif (
-            default_workspace != ""
-            and github_workspace != ""
-            and os.path.isdir(github_workspace + os.path.sep + default_workspace)
-        ):
-            logging.debug(
-                "[Context] Github action with override of DEFAULT_WORKSPACE"
-                f" - {github_workspace + os.path.sep + default_workspace}"
-            )
-            return github_workspace + os.path.sep + default_workspace
+        if default_workspace != "" and github_workspace != "":
+            candidates += [
+                (
+                    "Github action with override of DEFAULT_WORKSPACE"
+                    f" - {github_workspace + os.path.sep + default_workspace}",
+                    github_workspace + os.path.sep + default_workspace,
+                    github_workspace + os.path.sep + default_workspace,
+                )
+            ]
         # Github action without override of DEFAULT_WORKSPACE and NOT using DEFAULT_DOCKER_WORKSPACE_DIR
-        elif (
-            default_workspace == ""
-            and github_workspace != ""
-            and github_workspace != "/"
-            and os.path.isdir(github_workspace)
-        ):
-            logging.debug(
-                "[Context] Github action without override of DEFAULT_WORKSPACE"
-                f" and NOT using {DEFAULT_DOCKER_WORKSPACE_DIR}"
-                f" - {github_workspace}"
-            )
-            return github_workspace
+        if default_workspace == "" and github_workspace not in ["", "/"]:
+            candidates += [
+                (
+                    "Github action without override of DEFAULT_WORKSPACE"
+                    f" and NOT using {DEFAULT_DOCKER_WORKSPACE_DIR}"
+                    f" - {github_workspace}",
+                    github_workspace,
+                    github_workspace,
+                )
+            ]
+        # Check each directory once, in priority order
+        checked_directories = {}
+        for (context, directory, workspace) in candidates:
+            if directory not in checked_directories:
+                checked_directories[directory] = os.path.isdir(directory)
+            if checked_directories[directory]:
+                logging.debug(f"[Context] {context}")
+                return workspace
         # Unable to identify workspace
-        else:
-            raise FileNotFoundError(
-                f"[Context] Unable to find a workspace to lint \n"
-                f"DEFAULT_WORKSPACE: {default_workspace}\n"
-                f"GITHUB_WORKSPACE: {github_workspace}"
-            )
+        raise FileNotFoundError(
+            f"[Context] Unable to find a workspace to lint \n"
+            f"DEFAULT_WORKSPACE: {default_workspace}\n"
+            f"GITHUB_WORKSPACE: {github_workspace}"
+        )
 
     # Manage CLI variables
     def load_cli_vars(self):
@@ -409,11 +699,14 @@ class Megalinter:
         # If at least one language/linter is activated with VALIDATE_XXX , all others are deactivated by default
         if len(self.enable_descriptors) > 0 or len(self.enable_linters) > 0:
             self.default_linter_activation = False
-        # V3 legacy variables
-        for env_var in config.get():
-            if env_var.startswith("VALIDATE_") and env_var != "VALIDATE_ALL_CODEBASE":
-                if config.get(env_var) == "true":
-                    self.default_linter_activation = False
+        # V3 legacy variables (YAML config values can be booleans)
+        if any(
+            env_var.startswith("VALIDATE_")
+            and env_var != "VALIDATE_ALL_CODEBASE"
+            and value in ("true", True)
+            for env_var, value in config.get().items()
+        ):
+            self.default_linter_activation = False
 
     # Load and initialize all linters
     def load_linters(self):
@@ -466,7 +759,7 @@ class Megalinter:
                 or linter.disabled is True
                 or linter.cli_lint_mode in skip_cli_lint_modes
             ):
-                skipped_linters += [linter.name]
+                skipped_linters.append(linter.name)
                 if linter.disabled is True:
                     logging.warning(
                         f"{linter.name} has been temporary disabled in MegaLinter, please use a "
@@ -478,7 +771,7 @@ class Megalinter:
                         " {linter.cli_lint_mode} is in SKIP_CLI_LINT_MODES variable."
                     )
                 continue
-            self.linters += [linter]
+            self.linters.append(linter)
         # Display skipped linters in log
         show_skipped_linters = config.get("SHOW_SKIPPED_LINTERS", "true") == "true"
         if len(skipped_linters) > 0 and show_skipped_linters:
@@ -498,26 +791,87 @@ class Megalinter:
 
     # Define all file extensions to browse
     def compute_file_extensions(self):
-        file_extensions = []
-        file_names_regex = []
+        # Dicts remove duplicates while keeping the order of first occurrences
+        file_extensions = {}
+        file_names_regex = {}
         for linter in self.linters:
-            file_extensions += linter.file_extensions
-            file_names_regex += linter.file_names_regex
+            file_extensions.update(dict.fromkeys(linter.file_extensions))
+            file_names_regex.update(dict.fromkeys(linter.file_names_regex))
+        self.file_extensions = list(file_extensions)
+        self.file_names_regex = list(file_names_regex)
 
-        # Remove duplicates
-        self.file_extensions = list(dict.fromkeys(file_extensions))
-        self.file_names_regex = list(dict.fromkeys(file_names_regex))
+        # Compile regular expressions once, as they are matched with all files
+        self.filter_regex_include_object = utils.compile_regex(
+            self.filter_regex_include
+        )
+        self.filter_regex_exclude_object = utils.compile_regex(
+            self.filter_regex_exclude
+        )
+        self.file_names_regex_object = utils.compile_regex_list(self.file_names_regex)
 
     # Collect list of files matching extensions and regex
     def collect_files(self):
+        filtered_files = self.collect_filtered_files()
+
+        # Index files by extension, so each linter only filters files it may lint
+        files_by_extension = {}
+        files_matching_names = []
+        for file in filtered_files:
+            base_file_name = os.path.basename(file)
+            _, file_extension = os.path.splitext(base_file_name)
+            files_by_extension.setdefault(file_extension, []).append(file)
+            if self.file_names_regex_object.fullmatch(base_file_name):
+                files_matching_names.append(file)
+
+        # Collect matching files for each linter
+        for linter in self.linters:
+            if (
+                linter.lint_all_other_linters_files is True
+                or "*" in linter.file_extensions
+            ):
+                linter_files = filtered_files
+            else:
+                linter_files = []
+                for file_extension in set(linter.file_extensions):
+                    linter_files.extend(files_by_extension.get(file_extension, []))
+                if len(linter.file_names_regex) > 0:
+                    linter_files.extend(files_matching_names)
+                linter_files = sorted(set(linter_files))
+            linter.collect_files(linter_files)
+            if len(linter.files) == 0 and linter.lint_all_files is False:
+                linter.is_active = False
+
+        # Do not lint again files already linted with success, if requested
+        if config.get("MEGALINTER_RESULTS_CACHE", "false") == "true":
+            self.skip_results_cached_files()
+
+    # Remove unchanged files already linted with success from files of linters
+    def skip_results_cached_files(self):
+        cache_linters = [
+            linter
+            for linter in self.linters
+            if linter.is_active is True
+            and results_cache.ResultsCache.can_use_cache(linter)
+        ]
+        if len(cache_linters) == 0:
+            return
+        self.results_cache = results_cache.ResultsCache(self.workspace)
+        self.results_cache.hash_files(
+            [file for linter in cache_linters for file in linter.files]
+        )
+        self.results_cache.skip_cached_files(cache_linters)
+
+    # List files, then filter them according to MegaLinter level criteria
+    def collect_filtered_files(self):
         # Collect not filtered list of files
+        all_files = None
         files_to_lint = config.get_list("MEGALINTER_FILES_TO_LINT", [])
         if len(files_to_lint) > 0:
             # Files sent as input parameter
             all_files = list()
             for file_to_lint in files_to_lint:
                 if os.path.isfile(self.workspace + os.path.sep + file_to_lint):
-                    all_files += [self.workspace + os.path.sep + file_to_lint]
+                    all_files.append(self.workspace + os.path.sep + file_to_lint)
                 else:
                     logging.warning(
                         "[File listing] Input file "
@@ -528,6 +882,8 @@ class Megalinter:
                     )
         elif self.validate_all_code_base is False:
             # List files using git diff
+            import git
+
             try:
                 all_files = self.list_files_git_diff()
             except git.InvalidGitRepositoryError as git_err:
@@ -535,16 +891,11 @@ class Megalinter:
                     "Unable to list updated files from git diff. Switch to VALIDATE_ALL_CODE_BASE=true"
                 )
                 logging.debug(f"git error: {str(git_err)}")
-                all_files = self.list_files_all()
                 self.validate_all_code_base = True
-        else:
-            # List all files
-            all_files = self.list_files_all()
-        all_files = sorted(set(all_files))
+        # All files are listed once .gitignore files are read, to skip ignored ones
+        if all_files is None:
+            self.log_list_files_all()
 
-        logging.debug(
-            "All found files before filtering:" + utils.format_bullet_list(all_files)
-        )
         # Filter files according to fileExtensions, fileNames , filterRegexInclude and filterRegexExclude
         if len(self.file_extensions) > 0:
             logging.info(
@@ -559,53 +910,63 @@ class Megalinter:
         if self.filter_regex_exclude is not None:
             logging.info("- Excluding regex: " + self.filter_regex_exclude)
 
-        # List git ignored files if necessary
-        ignored_files = []
+        # Match files with .gitignore files if necessary
+        git_ignore_matcher = None
         if self.ignore_gitignore_files is True:
             try:
-                ignored_files = self.list_git_ignored_files()
-                if logging.getLogger().isEnabledFor(logging.DEBUG):
-                    logging.debug(
-                        "- Excluding .gitignored files ["
-                        + str(len(ignored_files))
-                        + "]: "
-                        + ", ".join(ignored_files)
-                    )
-                else:
-                    logging.info(
-                        "- Excluding .gitignored files ["
-                        + str(len(ignored_files))
-                        + "]: "
-                        + ", ".join(ignored_files[0:10])
-                        + (
-                            ",...(full list in DEBUG)"
-                            if len(ignored_files) > 10
-                            else ""
-                        )
-                    )
-            except git.InvalidGitRepositoryError as git_err:
-                logging.warning(f"Unable to list git ignored files ({str(git_err)})")
-                ignored_files = []
+                git_ignore_matcher = self.build_git_ignore_matcher()
+                logging.info("- Excluding .gitignored files")
             except Exception as git_err:
                 logging.warning(f"Unable to list git ignored files ({str(git_err)})")
-                ignored_files = []
 
-        # Apply all filters on file list
+        # Ignored directories and files are skipped while browsing the workspace, and
+        # listed files are matched one by one with their directories
+        def is_git_ignored(file):
+            return utils.is_git_ignored(
+                git_ignore_matcher,
+                os.path.relpath(file, self.workspace).replace(os.path.sep, "/"),
+            )
+
+        files_ignore_matcher = None
+        if all_files is None:
+            all_files = self.list_files_all(git_ignore_matcher)
+        elif git_ignore_matcher is not None:
+            files_ignore_matcher = is_git_ignored
+
+        if logging.getLogger().isEnabledFor(logging.DEBUG):
+            all_files = sorted(set(all_files))
+            logging.debug(
+                "All found files before filtering:"
+                + utils.format_bullet_list(all_files)
+            )
+
+        # Count found files while they are streamed into filters
+        found_files_number = 0
+
+        def count_found_files(files):
+            nonlocal found_files_number
+            for file in files:
+                found_files_number += 1
+                yield file
+
+        # Apply all filters on file list, then sort the remaining files only
         filtered_files = utils.filter_files(
-            all_files=all_files,
-            filter_regex_include=self.filter_regex_include,
-            filter_regex_exclude=self.filter_regex_exclude,
-            file_names_regex=self.file_names_regex,
+            all_files=count_found_files(all_files),
+            filter_regex_include=self.filter_regex_include_object,
+            filter_regex_exclude=self.filter_regex_exclude_object,
+            file_names_regex=self.file_names_regex_object,
             file_extensions=self.file_extensions,
-            ignored_files=ignored_files,
+            ignored_files=[],
             ignore_generated_files=self.ignore_generated_files,
+            ignore_matcher=files_ignore_matcher,
         )
+        filtered_files = sorted(set(filtered_files))
 
         logging.info(
             "Kept ["
             + str(len(filtered_files))
             + "] files on ["
-            + str(len(all_files))
+            + str(found_files_number)
             + "] found files"
         )
         logging.debug(
@@ -613,17 +974,15 @@ class Megalinter:
             "\n- ".join(filtered_files),
         )
 
-        # Collect matching files for each linter
-        for linter in self.linters:
-            linter.collect_files(filtered_files)
-            if len(linter.files) == 0 and linter.lint_all_files is False:
-                linter.is_active = False
+        return filtered_files
 
     def list_files_git_diff(self):
         # List all updated files from git
         logging.info(
             "Listing updated files in [" + self.github_workspace + "] using git diff."
         )
+        import git
+
         repo = git.Repo(os.path.realpath(self.github_workspace))
         # Add auth header if necessary
         if config.get("GIT_AUTHORIZATION_BEARER", "") != "":
@@ -648,45 +1007,127 @@ class Megalinter:
         all_files = list()
         for diff_line in diff.splitlines():
             if os.path.isfile(self.workspace + os.path.sep + diff_line):
-                all_files += [self.workspace + os.path.sep + diff_line]
+                all_files.append(self.workspace + os.path.sep + diff_line)
         return all_files
 
-    def list_files_all(self):
-        # List all files under workspace root directory
+    # Files are listed when filters read them, so filters are introduced beforehand
+    def log_list_files_all(self):
         logging.info(
             "Listing all files in directory [" + self.workspace + "], then filter with:"
         )
-        all_files = [
-            os.path.join(self.workspace, file)
-            for file in sorted(os.listdir(self.workspace))
-            if os.path.isfile(os.path.join(self.workspace, file))
-        ]
-        if logging.getLogger().isEnabledFor(logging.DEBUG):
-            logging.debug("Root dir content:" + utils.format_bullet_list(all_files))
+
+    def list_files_all(self, git_ignore_matcher=None):
+        # List all files under workspace root directory, yielded as they are found
         excluded_directories = utils.get_excluded_directories()
-        for (dirpath, dirnames, filenames) in os.walk(self.workspace, topdown=True):
-            dirnames[:] = [d for d in dirnames if d not in excluded_directories]
-            all_files += [os.path.join(dirpath, file) for file in sorted(filenames)]
-        return all_files
+        excluded_directory_regex = utils.compile_directory_exclude_regex(
+            self.filter_regex_exclude
+        )
+        root_files = []
+        sub_directories = []
+        try:
+            with os.scandir(self.workspace) as entries:
+                for entry in sorted(entries, key=lambda e: e.name):
+                    # Symlinks to directories are not browsed, like with os.walk
+                    if entry.is_dir(follow_symlinks=False):
+                        if not self.is_excluded_directory(
+                            entry, excluded_directories, excluded_directory_regex
+                        ) and not (
+                            git_ignore_matcher is not None
+                            and git_ignore_matcher(entry.name + "/")
+                        ):
+                            sub_directories.append(entry)
+                    elif not entry.is_dir() and not (
+                        git_ignore_matcher is not None
+                        and git_ignore_matcher(entry.name)
+                    ):
+                        root_files.append(entry.path)
+        except OSError as e:
+            logging.debug(f"Unable to list files in {self.workspace}: {str(e)}")
+        if logging.getLogger().isEnabledFor(logging.DEBUG):
+            logging.debug("Root dir content:" + utils.format_bullet_list(root_files))
+        yield from root_files
+        # Browse sub-directories in parallel threads, as it is mostly waiting for I/O
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            for directory_files in executor.map(
+                lambda directory: list(
+                    self.list_files_in_directory(
+                        directory.path,
+                        excluded_directories,
+                        excluded_directory_regex,
+                        git_ignore_matcher,
+                        directory.name + "/",
+                    )
+                ),
+                sub_directories,
+            ):
+                yield from directory_files
+
+    # Recursively list files using os.scandir, which gets file types without calling stat.
+    # Directories that can not be read are skipped, like with os.walk. Paths relative
+    # to the workspace are matched with .gitignore files, so ignored directories are
+    # not browsed, as git does not look into them
+    def list_files_in_directory(
+        self,
+        directory,
+        excluded_directories,
+        excluded_directory_regex=None,
+        git_ignore_matcher=None,
+        relative_directory="",
+    ):
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        if self.is_excluded_directory(
+                            entry, excluded_directories, excluded_directory_regex
+                        ):
+                            continue
+                        relative_path = relative_directory + entry.name + "/"
+                        if git_ignore_matcher is not None and git_ignore_matcher(
+                            relative_path
+                        ):
+                            continue
+                        yield from self.list_files_in_directory(
+                            entry.path,
+                            excluded_directories,
+                            excluded_directory_regex,
+                            git_ignore_matcher,
+                            relative_path,
+                        )
+                    elif not entry.is_dir() and not (
+                        git_ignore_matcher is not None
+                        and git_ignore_matcher(relative_directory + entry.name)
+                    ):
+                        yield entry.path
+        except OSError as e:
+            logging.debug(f"Unable to list files in {directory}: {str(e)}")
+
+    # Directories are skipped by name, or when FILTER_REGEX_EXCLUDE matches all their files
+    @staticmethod
+    def is_excluded_directory(entry, excluded_directories, excluded_directory_regex):
+        if entry.name in excluded_directories:
+            return True
+        return (
+            excluded_directory_regex is not None
+            and excluded_directory_regex.search(entry.path + os.path.sep) is not None
+        )
 
-    def list_git_ignored_files(self):
+    # Build a function matching paths relative to the workspace with .gitignore files
+    def build_git_ignore_matcher(self):
         dirpath = os.path.realpath(self.github_workspace)
-        repo = git.Repo(dirpath)
-        ignored_files = repo.git.execute(
-            [
-                "git",
-                "ls-files",
-                "--exclude-standard",
-                "--ignored",
-                "--others",
-                "--cached",
-            ]
-        ).splitlines()
-        ignored_files = map(lambda x: x + "**" if x.endswith("/") else x, ignored_files)
-        # ignored_files will be match against absolute path (in all_files), so it should be absolute
-        ignored_files = map(lambda x: os.path.join(dirpath, x), ignored_files)
-        ignored_files = sorted(list(ignored_files))
-        return ignored_files
+        if not os.path.exists(os.path.join(dirpath, ".git")):
+            import git
+
+            raise git.InvalidGitRepositoryError(dirpath)
+        git_ignore_matcher = utils.build_git_ignore_matcher(dirpath)
+        workspace_path = os.path.relpath(
+            os.path.realpath(self.workspace), dirpath
+        ).replace(os.path.sep, "/")
+        if workspace_path == ".":
+            return git_ignore_matcher
+        if workspace_path == ".." or workspace_path.startswith("../"):
+            raise ValueError(f"{self.workspace} is not in git repository {dirpath}")
+        return lambda path: git_ignore_matcher(workspace_path + "/" + path)
 
     def initialize_output(self):
         self.report_folder = config.get(
@@ -714,36 +1155,21 @@ class Megalinter:
         # Do not initialize reports if report folder is none or false
         if not utils.can_write_report_files(self):
             return
-        # Initialize output dir
-        os.makedirs(self.report_folder, exist_ok=True)
         # Clear report folder if requested
         if config.get("CLEAR_REPORT_FOLDER", "false") == "true":
             logging.info(
                 f"CLEAR_REPORT_FOLDER found: empty folder {self.report_folder}"
             )
             shutil.rmtree(self.report_folder, ignore_errors=True)
-            os.makedirs(self.report_folder, exist_ok=True)
+        # Initialize output dir
+        os.makedirs(self.report_folder, exist_ok=True)
 
     def initialize_logger(self):
-        logging_level_key = config.get("LOG_LEVEL", "INFO").upper()
-        logging_level_list = {
-            "INFO": logging.INFO,
-            "DEBUG": logging.DEBUG,
-            "WARNING": logging.WARNING,
-            "ERROR": logging.ERROR,
-            # Previous values for v3 ascending compatibility
-            "TRACE": logging.WARNING,
-            "VERBOSE": logging.INFO,
-        }
-        logging_level = (
-            logging_level_list[logging_level_key]
-            if logging_level_key in logging_level_list
-            else logging.INFO
+        logging_level = LOGGING_LEVELS.get(
+            config.get("LOG_LEVEL", "INFO").upper(), logging.INFO
         )
-        log_file = (
-            self.report_folder + os.path.sep + config.get("LOG_FILE", "megalinter.log")
-        )
-        if config.get("LOG_FILE", "") == "none":
+        log_file_name = config.get("LOG_FILE", "megalinter.log")
+        if log_file_name == "none":
             # Do not log console output in a file
             logging.basicConfig(
                 force=True,
@@ -755,89 +1181,96 @@ class Megalinter:
             )
         else:
             # Log console output in a file
-            if not os.path.isdir(os.path.dirname(log_file)):
-                os.makedirs(os.path.dirname(log_file), exist_ok=True)
+            log_file = os.path.join(self.report_folder, log_file_name)
+            os.makedirs(os.path.dirname(log_file), exist_ok=True)
             logging.basicConfig(
                 force=True,
                 level=logging_level,
                 format="%(message)s",
                 handlers=[
-                    logging.FileHandler(log_file, "w", "utf-8"),
+                    BufferedFileHandler(log_file),
                     logging.StreamHandler(sys.stdout),
                 ],
             )
 
     @staticmethod
     def display_header():
-        # Header prints
-        logging.info(utils.format_hyphens(""))
-        logging.info(utils.format_hyphens("MegaLinter, by OX Security"))
-        logging.info(utils.format_hyphens(""))
-        logging.info(
-            " - Image Creation Date: " + config.get("BUILD_DATE", "No docker image")
-        )
+        # Header prints, in a single log record
         logging.info(
-            " - Image Revision: " + config.get("BUILD_REVISION", "No docker image")
-        )
-        logging.info(
-            " - Image Version: " + config.get("BUILD_VERSION", "No docker image")
+            "\n".join(
+                [
+                    HEADER_HYPHENS,
+                    HEADER_TITLE,
+                    HEADER_HYPHENS,
+                    " - Image Creation Date: "
+                    + config.get("BUILD_DATE", "No docker image"),
+                    " - Image Revision: "
+                    + config.get("BUILD_REVISION", "No docker image"),
+                    " - Image Version: "
+                    + config.get("BUILD_VERSION", "No docker image"),
+                    HEADER_HYPHENS,
+                    "The MegaLinter documentation can be found at:",
+                    " - " + ML_DOC_URL,
+                    HEADER_HYPHENS,
+                ]
+            )
         )
-        logging.info(utils.format_hyphens(""))
-        logging.info("The MegaLinter documentation can be found at:")
-        logging.info(" - " + ML_DOC_URL)
-        logging.info(utils.format_hyphens(""))
         logging.info(log_section_start("megalinter-init", "MegaLinter initialization"))
-        if os.environ.get("GITHUB_REPOSITORY", "") != "":
+        github_repository = os.environ.get("GITHUB_REPOSITORY", "")
+        if github_repository != "":
+            pat_status = "set" if os.environ.get("PAT", "") != "" else ""
             logging.info(
-                "GITHUB_REPOSITORY: " + os.environ.get("GITHUB_REPOSITORY", "")
+                f"GITHUB_REPOSITORY: {github_repository}\n"
+                + f"GITHUB_REF: {os.environ.get('GITHUB_REF', '')}\n"
+                + f"GITHUB_RUN_ID: {os.environ.get('GITHUB_RUN_ID', '')}\n"
+                + f"PAT: {pat_status}"
             )
-            # logging.info("GITHUB_SHA: " + os.environ.get("GITHUB_SHA", ""))
-            logging.info("GITHUB_REF: " + os.environ.get("GITHUB_REF", ""))
-            # logging.info("GITHUB_TOKEN: " + os.environ.get("GITHUB_TOKEN", ""))
-            logging.info("GITHUB_RUN_ID: " + os.environ.get("GITHUB_RUN_ID", ""))
-            logging.info("PAT: " + "set" if os.environ.get("PAT", "") != "" else "")
         # Display config variables for debug mode
-        for name, value in sorted(config.get_config().items()):
-            logging.debug("" + name + "=" + str(value))
-        logging.debug(utils.format_hyphens(""))
+        if logging.getLogger().isEnabledFor(logging.DEBUG):
+            logging.debug(
+                "\n".join(
+                    f"{name}={str(value)}"
+                    for name, value in sorted(config.get_config().items())
+                )
+            )
+            logging.debug(HEADER_HYPHENS)
         logging.info("")
 
     def check_results(self):
-        print(f"::set-output name=has_updated_sources::{str(self.has_updated_sources)}")
-        if self.status == "success":
-            logging.info(c.green("✅ Successfully linted all files without errors"))
-            config.delete()
-            self.check_updated_sources_failure()
-        elif self.status == "warning":
-            logging.warning(
-                c.yellow("◬ Successfully linted all files, but with ignored errors")
-            )
-            config.delete()
-            self.check_updated_sources_failure()
+        # Set has_updated_sources output of the GitHub Action step
+        github_output = os.environ.get("GITHUB_OUTPUT", "")
+        if github_output != "":
+            with open(github_output, "a", encoding="utf-8") as f:
+                f.write(f"has_updated_sources={str(self.has_updated_sources)}\n")
         else:
-            logging.error(c.red("❌ Error(s) have been found during linting"))
-            logging.warning(
-                "To disable linters or customize their checks, you can use a .mega-linter.yml file "
-                "at the root of your repository"
+            print(
+                f"::set-output name=has_updated_sources::{str(self.has_updated_sources)}"
             )
-            logging.warning(f"More info at {ML_DOC_URL}/configuration/")
-            if self.cli is True:
-                if config.get("DISABLE_ERRORS", "false") == "true":
-                    config.delete()
-                    sys.exit(0)
-                else:
-                    config.delete()
-                    sys.exit(self.return_code)
-            config.delete()
-
-    def check_updated_sources_failure(self):
-        if self.has_updated_sources > 0 and self.fail_if_updated_sources is True:
-            logging.error(
-                c.red(
-                    "❌ Sources has been updated by linter auto-fixes, and FAIL_IF_UPDATED_SOURCES has been set to true"
+        # Runtime config is cleared whatever the result, including before exiting
+        try:
+            if self.status == "success":
+                logging.info(RESULT_SUCCESS_MESSAGE)
+            elif self.status == "warning":
+                logging.warning(RESULT_WARNING_MESSAGE)
+            else:
+                logging.error(RESULT_ERROR_MESSAGE)
+                logging.warning(
+                    "To disable linters or customize their checks, you can use a .mega-linter.yml file "
+                    "at the root of your repository\n"
+                    f"More info at {ML_DOC_URL}/configuration/"
                 )
-            )
-            sys.exit(1)
+                if self.cli is True:
+                    if config.get("DISABLE_ERRORS", "false") == "true":
+                        sys.exit(0)
+                    else:
+                        sys.exit(self.return_code)
+                return
+            # Fail if sources have been updated by auto-fixes, when requested
+            if self.has_updated_sources > 0 and self.fail_if_updated_sources is True:
+                logging.error(UPDATED_SOURCES_ERROR_MESSAGE)
+                sys.exit(1)
+        finally:
+            config.delete()
 
     def before_exit(self):
         # Clean git repository
@@ -846,34 +1279,30 @@ class Megalinter:
         self.manage_upgrade_message()
 
     def manage_clean_git_repo(self):
-        # Add auth header if necessary
+        # Remove auth header if it has been added: git config command is enough,
+        # no need to load the whole repository
         if self.has_git_extraheader is True:
-            repo = git.Repo(os.path.realpath(self.github_workspace))
-            repo.config_writer().set_value("http", "extraheader", "").release()
+            command = [
+                "git",
+                "-C",
+                os.path.realpath(self.github_workspace),
+                "config",
+                "--local",
+                "--replace-all",
+                "http.extraheader",
+                "",
+            ]
+            process = subprocess.run(
+                command, stdout=subprocess.PIPE, stderr=subprocess.STDOUT
+            )
+            if process.returncode != 0:
+                logging.warning(
+                    "Unable to clean git http.extraheader: "
+                    + utils.decode_utf8(process.stdout)
+                )
 
     # Propose legacy versions users to upgrade
     def manage_upgrade_message(self):
         mega_linter_version = config.get("BUILD_VERSION", "No docker image")
-        if (
-            "insiders" in mega_linter_version
-            or "v4" in mega_linter_version
-            or "v5" in mega_linter_version
-        ):
-            logging.warning(
-                c.yellow(
-                    "#######################################################################"
-                )
-            )
-            logging.warning(
-                c.yellow(
-                    "MEGA-LINTER HAS A NEW V6 VERSION at https://github.com/oxsecurity/megalinter .\n"
-                    + "Please upgrade your configuration by running the following command at the "
-                    + "root of your repository (requires node.js): \n"
-                    + c.green("npx mega-linter-runner --upgrade")
-                )
-            )
-            logging.warning(
-                c.yellow(
-                    "#######################################################################"
-                )
-            )
+        if LEGACY_VERSION_REGEX.search(mega_linter_version):
+            logging.warning(UPGRADE_MESSAGE)
@@ -14,6 +14,7 @@ __all__ = [
     "linter_factory",
     "plugin_factory",
     "pre_post_factory",
+    "results_cache",
     "utils",
     "alpaca"
     # "megalinter_server"
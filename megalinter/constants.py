@@ -17,6 +17,7 @@ ML_DOCKER_IMAGE_LEGACY_V5 = "megalinter/megalinter"
 
 DEFAULT_DOCKER_WORKSPACE_DIR = "/tmp/lint"
 DEFAULT_REPORT_FOLDER_NAME = "megalinter-reports"
+DEFAULT_RESULTS_CACHE_FOLDER_NAME = ".mega-linter-cache"
 DEFAULT_SARIF_REPORT_FILE_NAME = "megalinter-report.sarif"
 DEFAULT_SARIF_SCHEMA_URI = (
     "https://schemastore.azurewebsites.net/schemas/json/sarif-2.1.0-rtm.5.json"
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Results cache: remember files successfully linted, to not lint them again while
+neither their content nor the linter configuration change
+"""
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
+
+from megalinter import config
+from megalinter.constants import DEFAULT_RESULTS_CACHE_FOLDER_NAME
+
+RESULTS_CACHE_FILE_NAME = "results.db"
+
+
+# The cache is referenced by linters through their master: it does not keep an open
+# database connection, so linters can still be sent to pool workers
+class ResultsCache:
+    def __init__(self, workspace):
+        self.workspace = workspace
+        self.file_hashes = {}
+        self.linter_config_hashes = {}
+        cache_folder = os.path.join(workspace, DEFAULT_RESULTS_CACHE_FOLDER_NAME)
+        os.makedirs(cache_folder, exist_ok=True)
+        # Keep the cache out of commits of updated sources (APPLY_FIXES workflows)
+        git_ignore_file = os.path.join(cache_folder, ".gitignore")
+        if not os.path.isfile(git_ignore_file):
+            with open(git_ignore_file, "w", encoding="utf-8") as f:
+                f.write("*\n")
+        self.database_file = os.path.join(cache_folder, RESULTS_CACHE_FILE_NAME)
+        with closing(self.connect()) as connection:
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                "linter TEXT, file TEXT, file_hash TEXT, config_hash TEXT,"
+                " PRIMARY KEY (linter, file))"
+            )
+
+    def connect(self):
+        return sqlite3.connect(self.database_file)
+
+    # Linters linting files one by one, without updating them, can use the cache:
+    # list_of_files and project linters may check a file against the other ones
+    @staticmethod
+    def can_use_cache(linter):
+        return linter.cli_lint_mode == "file" and linter.apply_fixes is False
+
+    # Hash content of files in parallel threads, as it is mostly waiting for I/O
+    def hash_files(self, files):
+        files = [file for file in set(files) if file not in self.file_hashes]
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            for file, file_hash in zip(files, executor.map(hash_file, files)):
+                self.file_hashes[file] = file_hash
+
+    # Remove from linters files the ones already linted with success, and keep them
+    # in linter.files_cached so their results can be reported
+    def skip_cached_files(self, linters):
+        with closing(self.connect()) as connection:
+            for linter in linters:
+                config_hash = self.get_linter_config_hash(linter)
+                self.linter_config_hashes[linter.name] = config_hash
+                cached_results = dict(
+                    connection.execute(
+                        "SELECT file, file_hash FROM results"
+                        " WHERE linter = ? AND config_hash = ?",
+                        (linter.name, config_hash),
+                    )
+                )
+                linter.files_cached = []
+                files_to_lint = []
+                for file in linter.files:
+                    file_hash = self.file_hashes.get(file)
+                    if (
+                        file_hash is not None
+                        and cached_results.get(self.get_cache_file_name(file))
+                        == file_hash
+                    ):
+                        linter.files_cached.append(file)
+                    else:
+                        files_to_lint.append(file)
+                linter.files = files_to_lint
+                if len(linter.files_cached) > 0:
+                    logging.info(
+                        f"[Results cache] {linter.name}: skipped"
+                        f" {len(linter.files_cached)} unchanged files already"
+                        " linted with success"
+                    )
+
+    # Store files linted with success, and forget files linted with errors
+    def store_results(self, linters):
+        with closing(self.connect()) as connection:
+            for linter in linters:
+                config_hash = self.linter_config_hashes.get(linter.name)
+                if config_hash is None:
+                    continue
+                linted_files = set(linter.files)
+                for file_result in linter.files_lint_results:
+                    file = file_result["file"]
+                    if file not in linted_files or self.file_hashes.get(file) is None:
+                        continue
+                    if file_result["status"] == "success":
+                        connection.execute(
+                            "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?)",
+                            (
+                                linter.name,
+                                self.get_cache_file_name(file),
+                                self.file_hashes[file],
+                                config_hash,
+                            ),
+                        )
+                    else:
+                        connection.execute(
+                            "DELETE FROM results WHERE linter = ? AND file = ?",
+                            (linter.name, self.get_cache_file_name(file)),
+                        )
+            connection.commit()
+
+    # Files are stored relatively to the workspace, so the cache can be restored
+    # in another location
+    def get_cache_file_name(self, file):
+        return os.path.relpath(file, self.workspace)
+
+    # Hash what can change the result of a linter on a file: its variables, its
+    # configuration and ignore files, and MegaLinter version
+    def get_linter_config_hash(self, linter):
+        config_prefixes = (f"{linter.name}_", f"{linter.descriptor_id}_")
+        linter_config = {
+            "version": config.get("BUILD_VERSION", ""),
+            "variables": {
+                key: value
+                for key, value in config.get().items()
+                if key.startswith(config_prefixes)
+            },
+            "cli_executable": linter.cli_executable,
+        }
+        config_hash = hashlib.blake2b(
+            json.dumps(linter_config, sort_keys=True, default=str).encode("utf-8")
+        )
+        for linter_file in [linter.config_file, linter.ignore_file]:
+            if linter_file is not None and os.path.isfile(linter_file):
+                config_hash.update((hash_file(linter_file) or "").encode("utf-8"))
+        return config_hash.hexdigest()
+
+
+def hash_file(file):
+    file_hash = hashlib.blake2b()
+    try:
+        with open(file, "rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                file_hash.update(chunk)
+    except OSError as e:
+        logging.debug(f"[Results cache] Unable to hash {file}: {str(e)}")
+        return None
+    return file_hash.hexdigest()
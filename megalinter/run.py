@@ -6,10 +6,12 @@ Run mega-linter
 
 import megalinter
 
-linter = megalinter.Megalinter({"cli": True})
+# Pool workers import the main module: do not run MegaLinter again there
+if __name__ == "__main__":
+    linter = megalinter.Megalinter({"cli": True})
 
-# Guess who's there ? :)
-megalinter.alpaca()
+    # Guess who's there ? :)
+    megalinter.alpaca()
 
-# Run MegaLinter
-linter.run()
+    # Run MegaLinter
+    linter.run()
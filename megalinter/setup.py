@@ -12,7 +12,7 @@ setup(
     install_requires=[
         "gitpython",
         "jsonpickle",
-        "multiprocessing_logging",
+        "pathspec>=0.12",
         "pychalk",
         "pygithub",
         "python-gitlab",
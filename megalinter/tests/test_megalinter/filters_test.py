@@ -3,7 +3,9 @@
 Unit tests for utils class
 
 """
+import os
 import re
+import tempfile
 import unittest
 
 from megalinter import utils
@@ -108,3 +110,115 @@ class utilsTest(unittest.TestCase):
             self.assertListEqual(
                 sorted(filtered_files), sorted(expected), f"check {file_extensions}"
             )
+
+    def test_filter_files_with_compiled_regex(self):
+        basedir = DEFAULT_DOCKER_WORKSPACE_DIR + "/"
+        all_files = [
+            f"{basedir}src/foo.ext",
+            f"{basedir}src/Dockerfile",
+            f"{basedir}test/foo.ext",
+            f"{basedir}test/Dockerfile-dev",
+        ]
+        for (filter_regex_exclude, file_names_regex, expected) in [
+            (None, [], [f"{basedir}src/foo.ext", f"{basedir}test/foo.ext"]),
+            ("test/", [], [f"{basedir}src/foo.ext"]),
+            (
+                "test/",
+                ["Dockerfile(-.+)?"],
+                [f"{basedir}src/foo.ext", f"{basedir}src/Dockerfile"],
+            ),
+        ]:
+            filtered_files = utils.filter_files(
+                all_files=all_files,
+                filter_regex_include=None,
+                filter_regex_exclude=filter_regex_exclude,
+                file_names_regex=file_names_regex,
+                file_extensions=[".ext"],
+                ignored_files=[],
+                ignore_generated_files=False,
+            )
+            filtered_files_compiled = utils.filter_files(
+                all_files=all_files,
+                filter_regex_include=None,
+                filter_regex_exclude=utils.compile_regex(filter_regex_exclude),
+                file_names_regex=utils.compile_regex_list(file_names_regex),
+                file_extensions=[".ext"],
+                ignored_files=[],
+                ignore_generated_files=False,
+            )
+            self.assertListEqual(
+                sorted(filtered_files), sorted(expected), f"check {file_names_regex}"
+            )
+            self.assertListEqual(filtered_files_compiled, filtered_files)
+
+    def test_filter_files_with_git_ignore_matcher(self):
+        with tempfile.TemporaryDirectory() as repo_root:
+            os.makedirs(os.path.join(repo_root, ".git", "info"))
+            os.makedirs(os.path.join(repo_root, "src", "generated"))
+            os.makedirs(os.path.join(repo_root, "vendor"))
+            for (ignore_file, content) in [
+                (".gitignore", "*.log\n!keep.log\nbuild/\n!build/keep.txt\nvendor/\n"),
+                (".git/info/exclude", "local.txt\n"),
+                ("src/.gitignore", "generated/\n!debug.log\n"),
+                ("vendor/.gitignore", "!x.txt\n"),
+            ]:
+                with open(os.path.join(repo_root, ignore_file), "w") as f:
+                    f.write(content)
+            all_files = [
+                f"{repo_root}/README.md",
+                f"{repo_root}/error.log",
+                f"{repo_root}/keep.log",
+                f"{repo_root}/local.txt",
+                f"{repo_root}/build/foo.txt",
+                f"{repo_root}/build/keep.txt",
+                f"{repo_root}/vendor/x.txt",
+                f"{repo_root}/src/foo.txt",
+                f"{repo_root}/src/debug.log",
+                f"{repo_root}/src/generated/foo.txt",
+            ]
+            git_ignore_matcher = utils.build_git_ignore_matcher(repo_root)
+            filtered_files = utils.filter_files(
+                all_files=all_files,
+                filter_regex_include=None,
+                filter_regex_exclude=None,
+                file_names_regex=[],
+                file_extensions=["*"],
+                ignored_files=[],
+                ignore_generated_files=False,
+                ignore_matcher=lambda file: utils.is_git_ignored(
+                    git_ignore_matcher, os.path.relpath(file, repo_root)
+                ),
+            )
+            self.assertListEqual(
+                filtered_files,
+                [
+                    f"{repo_root}/README.md",
+                    f"{repo_root}/keep.log",
+                    f"{repo_root}/src/foo.txt",
+                    f"{repo_root}/src/debug.log",
+                ],
+            )
+            # Directories are matched with a trailing slash, to be skipped when browsed
+            for (directory, ignored) in [
+                ("build/", True),
+                ("src/", False),
+                ("src/generated/", True),
+                ("src/generated/build/", True),
+                ("vendor/", True),
+            ]:
+                self.assertEqual(git_ignore_matcher(directory), ignored, directory)
+
+    def test_compile_directory_exclude_regex(self):
+        for (regex, directory, excluded) in [
+            ("(node_modules/)", "/tmp/lint/src/node_modules/", True),
+            ("(src/.*\\.js)", "/tmp/lint/src/", False),
+            ("(/tests/|/docs/)", "/tmp/lint/docs/", True),
+        ]:
+            directory_regex = utils.compile_directory_exclude_regex(regex)
+            self.assertEqual(
+                directory_regex.search(directory) is not None,
+                excluded,
+                f"{regex} should {'' if excluded else 'not '}exclude {directory}",
+            )
+        for regex in [None, "", "(src/$)", "(src/(?!keep))", "\\bsrc\\b"]:
+            self.assertIsNone(utils.compile_directory_exclude_regex(regex))
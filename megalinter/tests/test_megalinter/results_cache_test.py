@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Unit tests for results cache
+
+"""
+import os
+import tempfile
+import unittest
+from types import SimpleNamespace
+
+from megalinter import Megalinter, config
+from megalinter.results_cache import ResultsCache
+
+
+class results_cache_test(unittest.TestCase):
+    def setUp(self):
+        config.set_config({})
+
+    def tearDown(self):
+        config.delete()
+
+    def build_linter(self, files):
+        return SimpleNamespace(
+            name="BASH_SHELLCHECK",
+            descriptor_id="BASH",
+            cli_executable="shellcheck",
+            cli_lint_mode="file",
+            apply_fixes=False,
+            config_file=None,
+            ignore_file=None,
+            files=list(files),
+            files_cached=[],
+            files_lint_results=[],
+        )
+
+    # Simulate a linter run on files, then store its results in the cache
+    def run_linter(self, workspace, files, errors):
+        results_cache = ResultsCache(workspace)
+        results_cache.hash_files(files)
+        linter = self.build_linter(files)
+        results_cache.skip_cached_files([linter])
+        linter.files_lint_results = [
+            {"file": file, "status": "error" if file in errors else "success"}
+            for file in linter.files
+        ]
+        results_cache.store_results([linter])
+        return linter
+
+    def test_results_cache(self):
+        with tempfile.TemporaryDirectory() as workspace:
+            files = []
+            for file_name in ["a.sh", "b.sh", "c.sh"]:
+                file = os.path.join(workspace, file_name)
+                with open(file, "w") as f:
+                    f.write(f"echo {file_name}\n")
+                files.append(file)
+            # First run: all files are linted
+            linter = self.run_linter(workspace, files, errors=[files[1]])
+            self.assertListEqual(linter.files, files)
+            # Cache folder is ignored by git
+            with open(
+                os.path.join(workspace, ".mega-linter-cache", ".gitignore"),
+                encoding="utf-8",
+            ) as f:
+                self.assertEqual(f.read(), "*\n")
+            # Files linted with success are skipped
+            linter = self.run_linter(workspace, files, errors=[])
+            self.assertListEqual(linter.files, [files[1]])
+            self.assertListEqual(linter.files_cached, [files[0], files[2]])
+            # Updated files are linted again
+            with open(files[0], "a") as f:
+                f.write("echo updated\n")
+            linter = self.run_linter(workspace, files, errors=[])
+            self.assertListEqual(linter.files, [files[0]])
+            # Updated linter configuration invalidates all results
+            config.set("BASH_SHELLCHECK_ARGUMENTS", "--severity=error")
+            linter = self.run_linter(workspace, files, errors=[])
+            self.assertListEqual(linter.files, files)
+
+    # Linter reporters must handle files skipped because of their cached results
+    def test_report_cached_files(self):
+        with tempfile.TemporaryDirectory() as workspace:
+            file = os.path.join(workspace, "a.sh")
+            with open(file, "w") as f:
+                f.write("echo a\n")
+            report_folder = os.path.join(workspace, "megalinter-reports")
+            config.set_config(
+                {
+                    "DEFAULT_WORKSPACE": workspace,
+                    "ENABLE_LINTERS": "BASH_SHELLCHECK",
+                    "LOG_FILE": "none",
+                    "OUTPUT_DETAIL": "detailed",
+                    "REPORT_OUTPUT_FOLDER": report_folder,
+                    "TAP_REPORTER": "true",
+                }
+            )
+            megalinter = Megalinter({"cli": False})
+            linter = next(
+                linter
+                for linter in megalinter.linters
+                if linter.name == "BASH_SHELLCHECK"
+            )
+            linter.linter_version_cache = "0.0.0"
+            linter.files = []
+            linter.files_cached = [file]
+            linter.run()
+            self.assertEqual(linter.files_lint_results[0]["stdout"], "")
+            with open(
+                os.path.join(
+                    report_folder, "linters_logs", "SUCCESS-BASH_SHELLCHECK.log"
+                ),
+                encoding="utf-8",
+            ) as f:
+                self.assertIn(f"✅ [SUCCESS] {file}", f.read())
@@ -5,11 +5,14 @@ import logging
 import os
 import re
 from fnmatch import fnmatch
-from typing import Any, Optional, Pattern, Sequence
+from typing import Any, Callable, Iterable, Optional, Pattern, Sequence, Union
 
-import git
+import pathspec
 from megalinter import config
-from megalinter.constants import DEFAULT_DOCKER_WORKSPACE_DIR
+from megalinter.constants import (
+    DEFAULT_DOCKER_WORKSPACE_DIR,
+    DEFAULT_RESULTS_CACHE_FOLDER_NAME,
+)
 
 REPO_HOME_DEFAULT = (
     DEFAULT_DOCKER_WORKSPACE_DIR
@@ -53,6 +56,7 @@ def get_excluded_directories():
         ".terraform",
         ".terragrunt-cache",
         "node_modules",
+        DEFAULT_RESULTS_CACHE_FOLDER_NAME,
         config.get("REPORT_OUTPUT_FOLDER", "megalinter-reports"),
     ]
     excluded_dirs = config.get_list("EXCLUDED_DIRECTORIES", default_excluded_dirs)
@@ -60,11 +64,40 @@ def get_excluded_directories():
     return set(excluded_dirs)
 
 
+# Compile a regular expression, unless it is already compiled
+def compile_regex(regex: Optional[Union[str, Pattern[str]]]) -> Optional[Pattern[str]]:
+    if not regex:
+        return None
+    if isinstance(regex, re.Pattern):
+        return regex
+    return re.compile(regex)
+
+
+# Join a list of regular expressions in a single alternation, to match them in one pass
+def compile_regex_list(regex_list: Sequence[str], flags: int = 0) -> Pattern[str]:
+    return re.compile("|".join(f"(?:{regex})" for regex in regex_list), flags)
+
+
+# Compile FILTER_REGEX_EXCLUDE to skip whole directories while browsing files.
+# A directory path (ending with a separator) matched by the regex means that all the
+# file paths under it are matched too, unless the regex checks what follows the match
+DIRECTORY_PRUNING_UNSAFE_REGEX_TOKENS = ["$", "\\Z", "\\b", "\\B", "(?=", "(?!"]
+
+
+def compile_directory_exclude_regex(regex: Optional[str]) -> Optional[Pattern[str]]:
+    if not regex or any(
+        token in regex for token in DIRECTORY_PRUNING_UNSAFE_REGEX_TOKENS
+    ):
+        return None
+    return re.compile(regex)
+
+
+# Regular expressions can be sent already compiled, to not compile them for each call
 def filter_files(
-    all_files: Sequence[str],
-    filter_regex_include: Optional[str],
-    filter_regex_exclude: Optional[str],
-    file_names_regex: Sequence[str],
+    all_files: Iterable[str],
+    filter_regex_include: Optional[Union[str, Pattern[str]]],
+    filter_regex_exclude: Optional[Union[str, Pattern[str]]],
+    file_names_regex: Union[Sequence[str], Pattern[str]],
     file_extensions: Any,
     ignored_files: Optional[Sequence[str]],
     ignore_generated_files: Optional[bool] = False,
@@ -72,18 +105,19 @@ def filter_files(
     file_contains_regex: Optional[Sequence[str]] = None,
     files_sub_directory: Optional[str] = None,
     lint_all_other_linters_files: bool = False,
+    ignore_matcher: Optional[Callable[[str], bool]] = None,
 ) -> Sequence[str]:
     file_extensions = set(file_extensions)
-    filter_regex_include_object = (
-        re.compile(filter_regex_include) if filter_regex_include else None
-    )
-    filter_regex_exclude_object = (
-        re.compile(filter_regex_exclude) if filter_regex_exclude else None
+    filter_regex_include_object = compile_regex(filter_regex_include)
+    filter_regex_exclude_object = compile_regex(filter_regex_exclude)
+    file_names_regex_object = (
+        file_names_regex
+        if isinstance(file_names_regex, re.Pattern)
+        else compile_regex_list(file_names_regex)
     )
-    file_names_regex_object = re.compile("|".join(file_names_regex))
     filtered_files = []
     file_contains_regex_object = (
-        re.compile("|".join(file_contains_regex), flags=re.MULTILINE)
+        compile_regex_list(file_contains_regex, flags=re.MULTILINE)
         if file_contains_regex
         else None
     )
@@ -104,6 +138,9 @@ def filter_files(
             fnmatch(file, pattern) for pattern in ignored_patterns
         ):
             continue
+        # Skip if file is matched by ignore matcher
+        if ignore_matcher is not None and ignore_matcher(file):
+            continue
 
         base_file_name = os.path.basename(file)
         _, file_extension = os.path.splitext(base_file_name)
@@ -146,6 +183,102 @@ def filter_files(
     return filtered_files
 
 
+# Build a function returning True if a path relative to the repository root, with "/"
+# separators and a trailing "/" for directories, is ignored by .git/info/exclude and
+# .gitignore files of its directories. Its parent directories are not checked: git does
+# not look into ignored directories, so callers browsing files skip them, and other
+# callers use is_git_ignored
+def build_git_ignore_matcher(repo_root: str) -> Callable[[str], bool]:
+    # .gitignore files are read once per directory, when a path of it is matched
+    directory_matchers = {}
+    # Matchers applying to paths of a directory: the ones of the directory and of its
+    # parents, with the position of the path part they match
+    path_matchers = {}
+
+    def get_directory_matcher(directory):
+        if directory not in directory_matchers:
+            ignore_files = [os.path.join(repo_root, directory, ".gitignore")]
+            if directory == "":
+                ignore_files.insert(0, os.path.join(repo_root, ".git/info/exclude"))
+            lines = []
+            for ignore_file in ignore_files:
+                if os.path.isfile(ignore_file):
+                    with open(ignore_file, "r", encoding="utf-8", errors="ignore") as f:
+                        lines.extend(f.read().splitlines())
+            spec = pathspec.GitIgnoreSpec.from_lines(lines)
+            directory_matchers[directory] = (
+                (compile_git_ignore_spec_regex(spec), spec)
+                if any(pattern.include is not None for pattern in spec.patterns)
+                else None
+            )
+        return directory_matchers[directory]
+
+    def get_path_matchers(directory):
+        if directory not in path_matchers:
+            matchers = (
+                []
+                if directory == ""
+                else list(
+                    get_path_matchers(directory[: directory.rfind("/", 0, -1) + 1])
+                )
+            )
+            directory_matcher = get_directory_matcher(directory[:-1])
+            if directory_matcher is not None:
+                matchers.append((len(directory), *directory_matcher))
+            path_matchers[directory] = matchers
+        return path_matchers[directory]
+
+    # Patterns of deeper .gitignore files have priority
+    def is_ignored(path):
+        ignored = False
+        directory = path[: path.rfind("/", 0, -1) + 1]
+        for (position, any_pattern_regex, spec) in get_path_matchers(directory):
+            matched_path = path[position:]
+            if any_pattern_regex.match(matched_path) is not None:
+                result = spec.check_file(matched_path)
+                if result.include is not None:
+                    ignored = result.include
+        return ignored
+
+    return is_ignored
+
+
+# Most paths match none of the patterns of a .gitignore file: a single regex finds
+# them, then the spec is only checked to know which pattern matches last. Patterns
+# matching in any directory share their prefix, so it is tried once per directory
+def compile_git_ignore_spec_regex(spec: pathspec.GitIgnoreSpec) -> Pattern:
+    any_directory_prefix = "^(?:.+/)?"
+    prefix_length = len(any_directory_prefix)
+    any_directory_patterns = []
+    other_patterns = []
+    for pattern in spec.patterns:
+        if pattern.include is None:
+            continue
+        # Named groups of patterns can not be repeated in a single regex
+        regex = re.sub(r"\(\?P<\w+>", "(?:", pattern.regex.pattern)
+        if regex.startswith(any_directory_prefix):
+            any_directory_patterns.append(regex[prefix_length:])
+        else:
+            other_patterns.append(regex)
+    if len(any_directory_patterns) > 0:
+        other_patterns.append(
+            any_directory_prefix + "(?:" + "|".join(any_directory_patterns) + ")"
+        )
+    return re.compile("|".join("(?:" + regex + ")" for regex in other_patterns))
+
+
+# Return True if a path relative to the repository root is ignored by git, or is in an
+# ignored directory: git does not look into it, so its files can not be included again
+# by a negated pattern or a deeper .gitignore file
+def is_git_ignored(git_ignore_matcher: Callable[[str], bool], path: str) -> bool:
+    separator = path.find("/")
+    while separator != -1 and separator < len(path) - 1:
+        if git_ignore_matcher(path[: separator + 1]):
+            return True
+        separator = path.find("/", separator + 1)
+    return git_ignore_matcher(path)
+
+
 # Center the string and complete blanks with hyphens (-)
 def format_hyphens(str_in):
     if str_in != "":
@@ -220,6 +353,8 @@ def decode_utf8(stdout):
 
 
 def list_updated_files(repo_home):
+    import git
+
     try:
         repo = git.Repo(repo_home)
     except git.InvalidGitRepositoryError:
@@ -233,6 +368,8 @@ def list_updated_files(repo_home):
 
 
 def is_git_repo(path):
+    import git
+
     try:
         _ = git.Repo(path).git_dir
         return True